@@ -1,8 +1,9 @@
 """Module that contains common functions for SPR to ADLP aggregation scripts"""
 import os
 import pandas as pd
+import numpy as np
 from rdkit import Chem
-from rdkit.Chem import Draw, AllChem
+from rdkit.Chem import Draw
 import cx_Oracle
 import sqlalchemy
 import crypt
@@ -10,6 +11,15 @@ import logging
 import platform
 import tempfile
 import pathlib
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# Rendering one structure takes a few ms, while starting the worker processes is not free. Under the spawn start method
+# (the default on macOS and Windows) each worker re-imports pandas, RDKit, cx_Oracle, etc. Under fork (the default on
+# Linux) the workers inherit the parent's modules instead, but still pay for the fork and for pickling the tasks.
+# Only render structures in parallel when there are enough of them to pay for starting the workers.
+_MIN_STRUCTURES_FOR_POOL = 500
+_STRUCTURE_POOL_CHUNKSIZE = 16
 
 
 def rep_item_for_dot_df(df, col_name, times_dup=3, sort=False):
@@ -24,22 +34,18 @@ def rep_item_for_dot_df(df, col_name, times_dup=3, sort=False):
     :type sort: bool
     :return Series of the duplicated item either sorted or not sorted.
     """
-    dup_list = []
-
     try:
-        for item in df[col_name]:
-            for i in range(times_dup):
-                dup_list.append(item)
+        col_values = df[col_name].to_numpy()
+    except KeyError:
+        raise RuntimeError("The DataFrame does not have a " + col_name + " column.")
 
-        a = pd.Series(dup_list)
+    a = pd.Series(np.repeat(col_values, times_dup))
 
-        if sort:
-            b = a.sort_values()
-            return b
-        else:
-            return a
-    except:
-        raise RuntimeError("The DataFrame does not have a " + col_name + " column.")
+    if sort:
+        b = a.sort_values()
+        return b
+    else:
+        return a
 
 
 def _connect(engine):
@@ -63,7 +69,7 @@ def get_structures_smiles_from_db(df_mstr_tbl):
 
     # Extract the CORE Broad ID from the df_mstr_tbl
     df_brd_core_id = df_mstr_tbl[['Broad ID']].copy()
-    df_brd_core_id.loc[:, 'BROAD_CORE_ID'] = df_brd_core_id['Broad ID'].apply(lambda x: x[5:13])
+    df_brd_core_id['BROAD_CORE_ID'] = df_brd_core_id['Broad ID'].str.slice(5, 13)
 
     # Create a cryptographic object
     c = crypt.Crypt()
@@ -83,9 +89,11 @@ def get_structures_smiles_from_db(df_mstr_tbl):
             sid=sid
         )
 
+        # Fetch rows from Oracle in large batches to cut down on network round-trips for big setup tables.
         engine = sqlalchemy.create_engine(cstr,
                                pool_recycle=3600,
                                pool_size=5,
+                               arraysize=10000,
                                echo=False
                                )
 
@@ -122,6 +130,22 @@ def get_structures_smiles_from_db(df_mstr_tbl):
     return df_merge_full_brd_smiles
 
 
+def _render_structure_img(smile_and_path):
+    """
+    Private method that renders the structure of one smile to an image file. Used as the worker process function by
+    render_structure_imgs.
+
+    :param smile_and_path: Tuple of (smile, image path)
+    :return None
+    """
+    current_smile_str, img_full_path = smile_and_path
+
+    m = Chem.MolFromSmiles(current_smile_str)
+    # TODO: Implement ability to align structures to a common smile core, e.g. by generating 2D coords for the BRD
+    #  control Nc1c(F)cc(C#N)c2cc[nH]c12 and aligning to it with AllChem.GenerateDepictionMatching2DStructure.
+    Draw.MolToFile(mol=m, filename=img_full_path, size=(250, 250))
+
+
 def render_structure_imgs(df_with_smiles, dir):
     """
     Does the work of rendering images from smiles using RDkit into a directory
@@ -135,39 +159,27 @@ def render_structure_imgs(df_with_smiles, dir):
     # Tag the smile field if it is not found.
     df_with_smiles = df_with_smiles.fillna('Not Found')
 
-    # Create an image Path Column
-    df_with_smiles.loc[:, 'IMG_PATH'] = ''
-
-    # Use BRD control as a template to align molecules.
-    template = Chem.MolFromSmiles('Nc1c(F)cc(C#N)c2cc[nH]c12')
-    AllChem.Compute2DCoords(template)
-
-    img_num = 0
-
-    # Create the images from smiles in a new directory
-    # TODO: Attempt to align structure doesn't fully work
-    for idx, row in df_with_smiles.iterrows():
+    # Build the image paths in order. Smiles that were not found are tagged instead of rendered.
+    ls_img_paths = [os.path.join(dir, f'{img_num}_{broad_id}.png') if smile != 'Not Found' else 'Not Found'
+                    for img_num, (broad_id, smile) in enumerate(zip(df_with_smiles['Broad ID'],
+                                                                    df_with_smiles['SMILES']))]
 
-        current_smile_str = row['SMILES']
+    # Collect the (smile, image path) pairs to render.
+    ls_render_tasks = [(smile, img_path) for smile, img_path in zip(df_with_smiles['SMILES'], ls_img_paths)
+                       if img_path != 'Not Found']
 
-        if current_smile_str == 'Not Found':
-            df_with_smiles.loc[idx, 'IMG_PATH'] = 'Not Found'
-            img_num += 1
-
-        else:
-            img_name = str(img_num) + '_' + row['Broad ID'] + '.png'
-            img_full_path = os.path.join(dir, img_name)
-
-            # Generate the structure of the current molecule using the control as a template to align
-            m = Chem.MolFromSmiles(current_smile_str)
-            # TODO: Impelement ability to align structures to a common smile core.
-            #AllChem.GenerateDepictionMatching2DStructure(m, template)
-            Draw.MolToFile(mol=m, filename=img_full_path, size=(250, 250))
-
-            # Save the image path to the DataFrame
-            df_with_smiles.loc[idx, 'IMG_PATH'] = img_full_path
+    # Create the images from smiles in a new directory. Large sets are spread across processes, with no more workers
+    # than there are chunks of work.
+    if len(ls_render_tasks) < _MIN_STRUCTURES_FOR_POOL:
+        for render_task in ls_render_tasks:
+            _render_structure_img(render_task)
+    else:
+        num_workers = min(os.cpu_count() or 1, math.ceil(len(ls_render_tasks) / _STRUCTURE_POOL_CHUNKSIZE))
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(_render_structure_img, ls_render_tasks, chunksize=_STRUCTURE_POOL_CHUNKSIZE))
 
-            img_num += 1
+    # Create an image Path Column
+    df_with_smiles['IMG_PATH'] = ls_img_paths
 
     logging.info('Structures rendered successfully, proceeding...')
     return df_with_smiles
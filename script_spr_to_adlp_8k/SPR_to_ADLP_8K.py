@@ -3,7 +3,6 @@ import os
 import re
 import platform
 import numpy as np
-from glob import glob
 import shutil
 from datetime import datetime
 import SPR_to_ADLP_Functions
@@ -39,12 +38,6 @@ def rename_images(df_analysis, path_img, image_type, raw_data_file_name):
 
     logging.info('Attempting to rename %s images...', image_type)
 
-    # Store the current working directory
-    my_dir = os.getcwd()
-
-    # Change the Directory to the ss image folder
-    os.chdir(path_img)
-
     # Delete legend from folder.
     ls_legend_file = [f for f in os.listdir(path_img) if re.search(r'Legend\.png', f)]
     if not len(ls_legend_file) == 0:
@@ -52,7 +45,7 @@ def rename_images(df_analysis, path_img, image_type, raw_data_file_name):
         os.unlink(legend_file_path)
 
     # Get the image file names.
-    img_files = glob('*.png')
+    img_files = [f for f in os.listdir(path_img) if f.endswith('.png') and not f.startswith('.')]
 
     # Extract the order the compounds were run.
     df_analysis['Cmpd_Run_Order'] = df_analysis['Analyte 1 Solution'].str.split('_', expand=True)[1]
@@ -83,7 +76,7 @@ def rename_images(df_analysis, path_img, image_type, raw_data_file_name):
     for idx, row in df_img_files.iterrows():
         ori_name = row['Original_Name']
         new_name = row['New_Name']
-        os.rename(ori_name, new_name)
+        os.rename(os.path.join(path_img, ori_name), os.path.join(path_img, new_name))
 
     # Add the image file names to the df_ss_seno DataFrame
     if image_type == 'ss':
@@ -91,9 +84,6 @@ def rename_images(df_analysis, path_img, image_type, raw_data_file_name):
     elif image_type == 'senso':
         df_analysis['Senso_Img'] = df_img_files['New_Name']
 
-    # change the directory back to the working dir.
-    os.chdir(my_dir)
-
     logging.info('%s Images were renamed successfully...', image_type)
     return df_analysis
 
@@ -158,8 +148,7 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures=False):
         immobilized_fc = str(config.get('meta', 'immobilized_fc'))
         immobilized_fc = immobilized_fc.strip(" ")
         immobilized_fc = immobilized_fc.replace(' ', '')
-        immobilized_fc_arr = immobilized_fc.split(',')
-        immobilized_fc_arr = [int(i) for i in immobilized_fc_arr]
+        immobilized_fc_arr = np.array(immobilized_fc.split(','), dtype=np.int64)
 
         # Continue collecting variables from the configuration file.
         experiment_date = config.get('meta','experiment_date')
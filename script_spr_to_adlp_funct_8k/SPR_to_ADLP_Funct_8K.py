@@ -1,6 +1,5 @@
 import pandas as pd
 import os
-from glob import glob  # todo: pathlib also has glob functionality, use that instead?
 import platform
 import tempfile
 import shutil
@@ -28,30 +27,51 @@ NOW = NOW.strftime('%y%m%d')
 logging.basicConfig(level=logging.INFO)
 
 
-def spr_displacement_top_conc(report_pt_file, df_cmpd_set):
-    """This method calculates the binding in RU at the top concentration.
+def read_report_pt_file(report_pt_file):
+    """
+    Reads the report point table exported from a Biacore 8k instrument. The table is read once and shared by
+    calc_max_theory_disp and spr_displacement_top_conc.
+
+    :param report_pt_file: reference to the report point file exported from the Biacore Instrument.
+    :return: DataFrame containing the report point table.
+    """
+    # Only parse the columns used by calc_max_theory_disp and spr_displacement_top_conc.
+    report_pt_cols = ['Cycle', 'Channel', 'Flow cell', 'Sensorgram type', 'Name', 'Step purpose',
+                      'Relative response (RU)', 'A-B-A 1 Concentration (µM)', 'A-B-A 1 Flanking solution']
 
-        :param report_pt_file: reference to the report point file exported from the Biacore Instrument.
-        :param df_cmpd_set: DataFrame containing the compound set data. This is used to extract the binding
-        RU at the top concentration of compound tested.
-        :returns Series containing the RU at the top concentration tested for each compound in the order tested.
-        """
     try:
-        # Read in data
-        df_rpt_pts_all = pd.read_excel(report_pt_file, sheet_name='Report point table', skiprows=2)
+        # Read in data. A callable usecols skips columns that aren't needed without failing on missing ones, so that
+        # missing columns can be reported below.
+        df_report_pt = pd.read_excel(report_pt_file, sheet_name='Report point table', skiprows=2,
+                                     usecols=lambda col: col in report_pt_cols)
     except:
         raise FileNotFoundError('The files could not be imported please check.')
 
-    # TODO: Check that the columns in the report point file match the expected values.
-    # Trim the df to only the columns we need.
-    df_rpt_pts_trim = df_rpt_pts_all[['Cycle', 'Channel', 'Flow cell', 'Sensorgram type', 'Name','Step purpose',
-                                      'Relative response (RU)', 'A-B-A 1 Concentration (µM)' ,
-                                      'A-B-A 1 Flanking solution']]
+    # Check that the columns in the report point file match the expected values.
+    missing_cols = [col for col in report_pt_cols if col not in df_report_pt.columns]
+    if missing_cols:
+        raise ValueError('The columns in the report point file do not match the expected names. Missing columns: ' +
+                         ', '.join(missing_cols))
 
-    # Remove not needed rows.
-    df_rpt_pts_trim = df_rpt_pts_trim[df_rpt_pts_trim['Step purpose'] == 'Analysis']
-    df_rpt_pts_trim = df_rpt_pts_trim[df_rpt_pts_trim['Sensorgram type'] == 'Corrected']
-    df_rpt_pts_trim = df_rpt_pts_trim[(df_rpt_pts_trim['Name'] == 'A-B-A binding late_1')]
+    # The rows are filtered on these low cardinality text columns, so store them as categories.
+    for col in ['Sensorgram type', 'Name', 'Step purpose']:
+        df_report_pt[col] = df_report_pt[col].astype('category')
+
+    return df_report_pt
+
+
+def spr_displacement_top_conc(df_rpt_pts_all, df_cmpd_set):
+    """This method calculates the binding in RU at the top concentration.
+
+        :param df_rpt_pts_all: DataFrame of the report point table returned by read_report_pt_file.
+        :param df_cmpd_set: DataFrame containing the compound set data. This is used to extract the binding
+        RU at the top concentration of compound tested.
+        :returns Series containing the RU at the top concentration tested for each compound in the order tested.
+        """
+    # Remove not needed rows in a single pass. read_report_pt_file only keeps the columns we need.
+    df_rpt_pts_trim = df_rpt_pts_all.loc[(df_rpt_pts_all['Step purpose'] == 'Analysis') &
+                                         (df_rpt_pts_all['Sensorgram type'] == 'Corrected') &
+                                         (df_rpt_pts_all['Name'] == 'A-B-A binding late_1')].copy()
 
     # Create a new column of BRD 4 digit numbers to merge
     df_rpt_pts_trim['BRD_MERGE'] = df_rpt_pts_trim['A-B-A 1 Flanking solution'].str.split('_', expand=True)[0]
@@ -78,55 +98,40 @@ def spr_displacement_top_conc(report_pt_file, df_cmpd_set):
     df_rpt_pts_trim = df_rpt_pts_trim.sort_values(['Channel'])
     df_rpt_pts_trim = df_rpt_pts_trim.reset_index(drop=True)
 
-    series_percent_disp_top = round(df_rpt_pts_trim['Relative response (RU)'].apply(lambda x: x*-1), 2)
+    series_percent_disp_top = (-df_rpt_pts_trim['Relative response (RU)']).round(2)
 
     return series_percent_disp_top
 
 
-def calc_max_theory_disp(file_path, fc_used_arr):
+def calc_max_theory_disp(df_report_pt, fc_used_arr):
     """
-    This method takes a report point file from a Biacore 8k instrument and extracts the blank/ zero concentration
-    values. These only contain competitor protein and not compound. These values represent the maximum amount that
-    a compound could theoretically displace a binding partner from the immobilized protein. The values are returned
-    in the order they were run on the instrument.
+    This method takes the parsed report point table of a Biacore 8k instrument and extracts the blank/ zero
+    concentration values. These only contain competitor protein and not compound. These values represent the maximum
+    amount that a compound could theoretically displace a binding partner from the immobilized protein. The values are
+    returned in the order they were run on the instrument.
 
-    :param file_path: path to report point file
+    :param df_report_pt: DataFrame of the report point table returned by read_report_pt_file.
     :param fc_used_arr: integer array of the flow channels used.
     :return: Series containing all of the max displacement values in order.
     """
 
-    try:
-        df_report_pt = pd.read_excel(file_path, sheet_name='Report point table', skiprows=2)
-
-    except:
-        raise FileNotFoundError('The files could not be imported please check.')
-
-    # Filter out all columns not needed
-    df_report_pt_trim = df_report_pt[
-        ['Cycle', 'Channel', 'Flow cell', 'Sensorgram type', 'Name', 'Relative response (RU)', 'A-B-A 1 Concentration (µM)'
-            , 'A-B-A 1 Flanking solution']]
+    # Filter to only the corrected blank injections of the immobilized flow channels. Only the two columns needed are
+    # taken from the report point table, so no copy of the full table is made.
+    df_blanks = df_report_pt.loc[(df_report_pt['Channel'].isin(fc_used_arr)) &
+                                 (df_report_pt['Sensorgram type'] == 'Corrected') &
+                                 (df_report_pt['Name'] == 'A-B-A binding late_1') &
+                                 (df_report_pt['A-B-A 1 Concentration (µM)'] == 0),
+                                 ['Channel', 'Relative response (RU)']]
 
-    # For each FC immobilized create a new DataFrame and filter for that FC.
-    # Create a list with all of the flow channel filtered DataFrames.
-    ls_max_theory = []
+    # Keep the flow channels in the order of fc_used_arr and number the pairs of blanks within each flow channel.
+    series_fc_order = df_blanks['Channel'].map({fc: i for i, fc in enumerate(fc_used_arr)})
+    series_blank_pair = df_blanks.groupby('Channel').cumcount() // 2
 
-    for fc in fc_used_arr:
-        df_filter = df_report_pt_trim.copy()
-        df_filter = df_filter[(df_filter['Channel'] == fc) & (df_filter['Sensorgram type'] == 'Corrected') &
-                              (df_filter['Name'] == 'A-B-A binding late_1')]
+    # Average and negate each pair of blanks in one step. An unpaired trailing blank is halved, the same as a pair
+    # with a zero.
+    series_max_theory = df_blanks['Relative response (RU)'].groupby([series_fc_order, series_blank_pair]).sum() * -0.5
 
-        # Filter to only the blank injections.
-        df_filter = df_filter[df_filter['A-B-A 1 Concentration (µM)'] == 0]
-
-        blanks_list = df_filter['Relative response (RU)'].tolist()
-
-        avg_blanks_per_fc = [sum(blanks_list[i: i + 2]) / 2 for i in range(0,len(blanks_list), 2)]
-
-        ls_max_theory = ls_max_theory + avg_blanks_per_fc
-
-    ls_max_theory_neg = [i * -1 for i in ls_max_theory]
-
-    return pd.Series(ls_max_theory_neg)
+    return series_max_theory.reset_index(drop=True)
 
 
 def rename_images(df, path_img, image_type, raw_data_file_name):
@@ -140,62 +145,99 @@ def rename_images(df, path_img, image_type, raw_data_file_name):
     :return: The df passed in with the column with the image names added.
     """
 
-    # Store the current working directory
-    my_dir = os.getcwd()
-
-    # Change the Directory to the ss image folder
-    os.chdir(path_img)
-
     # Delete legend from folder.
     ls_legend_file = [f for f in os.listdir(path_img) if re.search(r'Legend\.png', f)]
     if not len(ls_legend_file) == 0:
         legend_file_path = os.path.join(path_img, ls_legend_file[0])
         os.unlink(legend_file_path)
 
-    # Get the image file names.
-    img_files = glob('*.png')
+    # Get the image file names sorted on the channel number the file name starts with.
+    # Hidden files are skipped, matching the previous glob('*.png') behaviour.
+    img_files = sorted((entry.name for entry in os.scandir(path_img)
+                        if entry.name.endswith('.png') and not entry.name.startswith('.')),
+                       key=lambda name: int(name.split('-', 1)[0]))
+    img_channels = [name.split('-', 1)[0] for name in img_files]
 
     # Sort df_ss_senso
     df_ss_senso = df.sort_values(['Channel'])
     df_ss_senso = df_ss_senso.reset_index(drop=True)
 
-    # Create a DataFrame with the file names.
-    df_img_files = pd.DataFrame(img_files)
-    df_img_files.columns = ['Original_Name']
+    if len(img_files) != len(df_ss_senso.index):
+        raise RuntimeError('The number of ' + image_type + ' images does not match the number of results.')
 
-    # Extract the channel number and sort.
-    df_img_files['Channel'] = df_img_files['Original_Name'].str.split('-', expand=True)[0]
-    df_img_files['Channel'] = df_img_files['Channel'].astype(int)
-
-    # Sort on Channel
-    df_img_files = df_img_files.sort_values(['Channel'])
-    df_img_files = df_img_files.reset_index(drop=True)
-
-    # Create a column of what we would like the name of the files to be changed to.
+    # Create a list of what we would like the name of the files to be changed to.
     # Usual format is BRD-6994_s_190916_7279_function_12
     # Add some randomness to the file path so that if the same cmpd on the same day was run, in a second run,
     # it would still be unique
     rand_int = np.random.randint(low=10, high=99)
-    df_img_files['New_Name'] = df_ss_senso['A-B-A 1 Solution'] + '_' + raw_data_file_name + '_' + str(rand_int) + '_' \
-                               + df_img_files['Channel'].astype(str) + '.png'
+    new_img_files = [f'{solution}_{raw_data_file_name}_{rand_int}_{int(channel)}.png'
+                     for solution, channel in zip(df_ss_senso['A-B-A 1 Solution'], img_channels)]
 
     # Rename the files
-    for idx, row in df_img_files.iterrows():
-        ori_name = row['Original_Name']
-        new_name = row['New_Name']
-        os.rename(ori_name, new_name)
+    for ori_name, new_name in zip(img_files, new_img_files):
+        os.rename(os.path.join(path_img, ori_name), os.path.join(path_img, new_name))
 
     # Add the image file names to the df_ss_seno DataFrame
     if image_type == 'ss':
-        df_ss_senso['Steady_State_Img'] = df_img_files['New_Name']
+        df_ss_senso['Steady_State_Img'] = new_img_files
     elif image_type == 'senso':
-        df_ss_senso['Senso_Img'] = df_img_files['New_Name']
+        df_ss_senso['Senso_Img'] = new_img_files
 
-    # change the directory back to the working dir.
-    os.chdir(my_dir)
     return df_ss_senso
 
 
+def read_immobilized_protein_info(config, num_channels=8):
+    """
+    Method that reads the immobilized protein BIP, RU and MW of each flow channel from the configuration file.
+
+    :param config: ConfigParser object of the configuration file.
+    :param num_channels: Number of flow channels on the instrument.
+    :return: Tuple of (BIP, RU, MW) arrays, each indexed by channel number - 1.
+    """
+    fc_nums = range(1, num_channels + 1)
+    arr_protein_bip = np.array([config.get('meta', f'fc{fc}_protein_BIP') for fc in fc_nums], dtype=object)
+    arr_protein_ru = np.array([float(config.get('meta', f'fc{fc}_protein_RU')) for fc in fc_nums])
+    arr_protein_mw = np.array([float(config.get('meta', f'fc{fc}_protein_MW')) for fc in fc_nums])
+
+    return arr_protein_bip, arr_protein_ru, arr_protein_mw
+
+
+def validate_channels(series_channel, num_channels):
+    """
+    Method that checks that every channel is a whole number from 1 to num_channels, as the protein info arrays are
+    indexed by channel number - 1.
+
+    :param series_channel: Series of the channels from the fit results.
+    :param num_channels: Number of flow channels on the instrument.
+    :return: None
+    """
+    series_channel_num = pd.to_numeric(series_channel, errors='coerce')
+    valid_channels = series_channel_num.between(1, num_channels) & (series_channel_num % 1 == 0)
+    if not valid_channels.all():
+        raise RuntimeError('The kinetic results contain invalid channels ' +
+                           str(series_channel[~valid_channels].tolist()) +
+                           '. Channels must be whole numbers from 1 to ' + str(num_channels) + '.')
+
+
+def get_protein_info_by_channel(df, arr_protein_ru, arr_protein_mw, arr_protein_bip):
+    """
+    Method that looks up the immobilized protein RU, MW and BIP for the channel of each row of the fit results.
+
+    :param df: DataFrame containing the steady state or kinetic fit results.
+    :param arr_protein_ru: Array of the immobilized protein RU, indexed by channel number - 1.
+    :param arr_protein_mw: Array of the immobilized protein MW, indexed by channel number - 1.
+    :param arr_protein_bip: Array of the immobilized protein BIP, indexed by channel number - 1.
+    :return: DataFrame with the PROTEIN_RU, PROTEIN_MW and PROTEIN_ID columns, using the index of df.
+    """
+    validate_channels(series_channel=df['Channel'], num_channels=len(arr_protein_ru))
+
+    channel_idx = pd.to_numeric(df['Channel']).to_numpy(dtype=int) - 1
+
+    return pd.DataFrame({'PROTEIN_RU': arr_protein_ru[channel_idx],
+                         'PROTEIN_MW': arr_protein_mw[channel_idx],
+                         'PROTEIN_ID': arr_protein_bip[channel_idx]}, index=df.index)
+
+
 def spr_create_dot_upload_file(config_file, save_file, clip, structures):
     """
     This program aggregates all of the data from and SPR Dose Functional assay into one Excel file for ADLP upload.
@@ -240,8 +282,7 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
         immobilized_fc = str(config.get('meta', 'immobilized_fc'))
         immobilized_fc = immobilized_fc.strip(" ")
         immobilized_fc = immobilized_fc.replace(' ', '')
-        immobilized_fc_arr = immobilized_fc.split(',')
-        immobilized_fc_arr = [int(i) for i in immobilized_fc_arr]
+        immobilized_fc_arr = np.array(immobilized_fc.split(','), dtype=np.int64)
 
         if int(num_fc_used) != len(immobilized_fc_arr):
             raise RuntimeError ('The number of flow channels used is not equal to the number of immobilized flow '
@@ -258,36 +299,8 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
         raw_data_filename = config.get('meta','raw_data_filename')
         directory_folder = config.get('meta','directory_folder')
 
-        # Get all of the immobilized protein info.
-        # BIP
-        fc1_protein_BIP = config.get('meta', 'fc1_protein_BIP')
-        fc2_protein_BIP = config.get('meta', 'fc2_protein_BIP')
-        fc3_protein_BIP = config.get('meta', 'fc3_protein_BIP')
-        fc4_protein_BIP = config.get('meta', 'fc4_protein_BIP')
-        fc5_protein_BIP = config.get('meta', 'fc5_protein_BIP')
-        fc6_protein_BIP = config.get('meta', 'fc6_protein_BIP')
-        fc7_protein_BIP = config.get('meta', 'fc7_protein_BIP')
-        fc8_protein_BIP = config.get('meta', 'fc8_protein_BIP')
-
-        # RU
-        fc1_protein_RU = float(config.get('meta', 'fc1_protein_RU'))
-        fc2_protein_RU = float(config.get('meta', 'fc2_protein_RU'))
-        fc3_protein_RU = float(config.get('meta', 'fc3_protein_RU'))
-        fc4_protein_RU = float(config.get('meta', 'fc4_protein_RU'))
-        fc5_protein_RU = float(config.get('meta', 'fc5_protein_RU'))
-        fc6_protein_RU = float(config.get('meta', 'fc6_protein_RU'))
-        fc7_protein_RU = float(config.get('meta', 'fc7_protein_RU'))
-        fc8_protein_RU = float(config.get('meta', 'fc8_protein_RU'))
-
-        # MW
-        fc1_protein_MW = float(config.get('meta', 'fc1_protein_MW'))
-        fc2_protein_MW = float(config.get('meta','fc2_protein_MW'))
-        fc3_protein_MW = float(config.get('meta','fc3_protein_MW'))
-        fc4_protein_MW = float(config.get('meta','fc4_protein_MW'))
-        fc5_protein_MW = float(config.get('meta', 'fc5_protein_MW'))
-        fc6_protein_MW = float(config.get('meta', 'fc6_protein_MW'))
-        fc7_protein_MW = float(config.get('meta', 'fc7_protein_MW'))
-        fc8_protein_MW = float(config.get('meta', 'fc8_protein_MW'))
+        # Get all of the immobilized protein info for flow channels 1-8.
+        arr_protein_bip, arr_protein_ru, arr_protein_mw = read_immobilized_protein_info(config=config)
 
         # Get meta data for the protein floated
         protein_floated_BIP = config.get('meta', 'protein_floated_BIP')
@@ -327,6 +340,12 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
     except Exception:
         raise RuntimeError('Issue reading in data from either steady state or kinetic Excels files.')
 
+    # Check the channels before any images are renamed.
+    validate_channels(series_channel=df_senso_txt['Channel'], num_channels=len(arr_protein_ru))
+
+    # Read in the report point file once as it is used for both the max theoretical and top concentration displacement.
+    df_report_pt = read_report_pt_file(report_pt_file=path_report_pt)
+
     """
     Biacore 8k names the images in a different way compared to S200 and T200. Therefore, we need to rename the images
     to be consistent for Dotmatics.
@@ -361,36 +380,39 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
                                          image_type='senso', raw_data_file_name=raw_data_filename)
 
             try:
-                # Start building the final Dotmatics DataFrame
-                df_final_for_dot = pd.DataFrame()
-
+                # Start building the final Dotmatics DataFrame with the columns taken from the setup table and the
+                # config file in one go.
                 # NB: For the 8k each row of a 96 well testing plate corresponds to compound which corresponds to 1 flow channel.
-                df_final_for_dot['BROAD_ID'] = df_cmpd_set['Broad ID']
-
-                # Add structure column
-                df_final_for_dot.loc[:, 'STRUCTURES'] = ''
-
-                # Add the Project Code.  Get this from the config file.
-                df_final_for_dot['PROJECT_CODE'] = project_code
-
-                #  Add an empty column called curve_valid
-                df_final_for_dot.loc[:, 'CURVE_VALID'] = ''
-
-                # Add an empty column called steady_state_img
-                df_final_for_dot.loc[:, 'STEADY_STATE_IMG'] = ''
-
-                # Add an empty column called 1to1_img
-                df_final_for_dot.loc[:, '1to1_IMG'] = ''
-
-                # Add the starting compound concentrations
-                df_final_for_dot['TOP_COMPOUND_UM'] = df_cmpd_set['Test [Cpd] uM']
+                df_final_for_dot = pd.DataFrame({
+                    'BROAD_ID': df_cmpd_set['Broad ID'],
+                    'STRUCTURES': '',
+                    'PROJECT_CODE': project_code,
+                    'CURVE_VALID': '',
+                    'STEADY_STATE_IMG': '',
+                    '1to1_IMG': '',
+                    'TOP_COMPOUND_UM': df_cmpd_set['Test [Cpd] uM'],
+                    'COMMENTS': '',
+                    'FC': '2-1',
+                    'PROTEIN_FLOATED_ID': protein_floated_BIP,
+                    'PROTEIN_FLOATED_CONC_UM': protein_floated_conc_uM,
+                    'PROTEIN_FLOATED_MW': protein_floated_MW,
+                    'MW': df_cmpd_set['MW'],
+                    'INSTRUMENT': instrument,
+                    'EXP_DATE': experiment_date,
+                    'NUCLEOTIDE': nucleotide,
+                    'CHIP_LOT': chip_lot,
+                    'OPERATOR': operator,
+                    'PROTOCOL_ID': protocol,
+                    'RAW_DATA_FILE': raw_data_filename,
+                    'DIR_FOLDER': directory_folder})
 
                 # Calculate Max theoretical displacement
                 # Average of the 2 blanks for each flow cell
-                df_final_for_dot['MAX_THEORETICAL_DISP_RU'] = calc_max_theory_disp(path_report_pt, immobilized_fc_arr)
+                df_final_for_dot['MAX_THEORETICAL_DISP_RU'] = calc_max_theory_disp(df_report_pt, immobilized_fc_arr)
 
                 # Get the percent displacement at the top conc for each flow channel using the report point file.
-                percent_disp = pd.Series(spr_displacement_top_conc(report_pt_file=path_report_pt, df_cmpd_set=df_cmpd_set))
+                percent_disp = pd.Series(spr_displacement_top_conc(df_rpt_pts_all=df_report_pt,
+                                                                   df_cmpd_set=df_cmpd_set))
 
                 # Extract the RU Max for each compound using the report point file.
                 df_final_for_dot['RU_TOP_CMPD'] = df_final_for_dot['MAX_THEORETICAL_DISP_RU'] - percent_disp
@@ -414,47 +436,13 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
                 df_final_for_dot['KD_LITTLE_1_1_BINDING'] = df_senso_txt['kd (1/s)']
                 df_final_for_dot['KD_1_1_BINDING_UM'] = df_senso_txt['KD (M)'] * 1000000
 
-                # Continue creating new columns
-                df_final_for_dot['COMMENTS'] = ''
-
-                # Rename the flow channels and add the flow channel column
-                df_final_for_dot.loc[:, 'FC'] = '2-1'
-
-                # Add protein RU
-                protein_ru_dict = {1: fc1_protein_RU, 2: fc2_protein_RU, 3: fc3_protein_RU,
-                                   4: fc4_protein_RU, 5: fc5_protein_RU, 6: fc6_protein_RU, 7: fc7_protein_RU,
-                                   8: fc8_protein_RU}
-                df_final_for_dot['PROTEIN_RU'] = df_senso_txt['Channel'].map(protein_ru_dict)
-
-                # Add protein MW
-                protein_mw_dict = {1: fc1_protein_MW, 2: fc2_protein_MW, 3: fc3_protein_MW,
-                                   4: fc4_protein_MW, 5: fc5_protein_MW, 6: fc6_protein_MW,
-                                   7: fc7_protein_MW, 8: fc8_protein_MW}
-                df_final_for_dot['PROTEIN_MW'] = df_senso_txt['Channel'].map(protein_mw_dict)
-
-                # Add protein BIP
-                protein_bip_dict = {1: fc1_protein_BIP, 2 : fc2_protein_BIP, 3: fc3_protein_BIP,
-                                    4: fc4_protein_BIP, 5: fc5_protein_BIP, 6: fc6_protein_BIP,
-                                    7: fc7_protein_BIP, 8: fc8_protein_BIP}
-                df_final_for_dot['PROTEIN_ID'] = df_senso_txt['Channel'].map(protein_bip_dict)
-
-                # Add columns for protein floated meta data.
-                df_final_for_dot['PROTEIN_FLOATED_ID'] = protein_floated_BIP
-                df_final_for_dot['PROTEIN_FLOATED_CONC_UM'] = protein_floated_conc_uM
-                df_final_for_dot['PROTEIN_FLOATED_MW'] = protein_floated_MW
-
-                # Add the MW for each compound. Uses the step table.
-                df_final_for_dot['MW'] = df_cmpd_set['MW']
-
-                # Continue adding columns to final DataFrame
-                df_final_for_dot.loc[:, 'INSTRUMENT'] = instrument
-                df_final_for_dot.loc[:, 'EXP_DATE'] = experiment_date
-                df_final_for_dot.loc[:, 'NUCLEOTIDE'] = nucleotide
-                df_final_for_dot.loc[:, 'CHIP_LOT'] = chip_lot
-                df_final_for_dot.loc[:, 'OPERATOR'] = operator
-                df_final_for_dot.loc[:, 'PROTOCOL_ID'] = protocol
-                df_final_for_dot.loc[:, 'RAW_DATA_FILE'] = raw_data_filename
-                df_final_for_dot.loc[:, 'DIR_FOLDER'] = directory_folder
+                # Add protein RU, MW and BIP for the channel each compound was run on.
+                df_protein_info = get_protein_info_by_channel(df=df_senso_txt, arr_protein_ru=arr_protein_ru,
+                                                              arr_protein_mw=arr_protein_mw,
+                                                              arr_protein_bip=arr_protein_bip)
+                df_final_for_dot['PROTEIN_RU'] = df_protein_info['PROTEIN_RU']
+                df_final_for_dot['PROTEIN_MW'] = df_protein_info['PROTEIN_MW']
+                df_final_for_dot['PROTEIN_ID'] = df_protein_info['PROTEIN_ID']
 
                 # Add the unique ID #
                 rand_int = np.random.randint(low=10, high=99)
@@ -497,6 +485,8 @@ def spr_create_dot_upload_file(config_file, save_file, clip, structures):
             try:
 
                 # Create a Pandas Excel writer using XlsxWriter as the engine.
+                # NB: XlsxWriter's constant_memory mode can't be used here. Pandas writes the cells column by column
+                # and the image row heights are set after the data is written, both of which constant_memory drops.
                 writer = pd.ExcelWriter(adlp_save_file_path, engine='xlsxwriter')
 
                 # Convert the DataFrame to an XlsxWriter Excel object.
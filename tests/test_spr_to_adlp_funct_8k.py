@@ -0,0 +1,248 @@
+"""Module for testing SPR_to_ADLP_Funct_8K.py Script"""
+
+import os
+import tempfile
+import configparser
+from unittest import TestCase
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from script_spr_to_adlp_funct_8k.SPR_to_ADLP_Funct_8K import rename_images, calc_max_theory_disp, \
+    read_report_pt_file, read_immobilized_protein_info, validate_channels, get_protein_info_by_channel
+
+
+class TestRenameImagesFunct8K(TestCase):
+    """
+    Test class that tests the rename_images() method of the functional 8K script using a temporary image directory.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a temporary directory of shuffled channel images plus a legend image, and the matching fit results.
+        :return: None
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path_img = self.tmp_dir.name
+
+        # Create the image files out of channel order.
+        for img_name in ['3-cycle_7.png', '1-cycle_7.png', '2-cycle_7.png', 'Legend.png']:
+            open(os.path.join(self.path_img, img_name), 'w').close()
+
+        # Fit results are also out of channel order.
+        self.df_results = pd.DataFrame({'Channel': [2, 3, 1],
+                                        'A-B-A 1 Solution': ['BRD-0002_2', 'BRD-0003_3', 'BRD-0001_1']})
+
+        self.expected_names = ['BRD-0001_1_200708_7324_function_42_1.png',
+                               'BRD-0002_2_200708_7324_function_42_2.png',
+                               'BRD-0003_3_200708_7324_function_42_3.png']
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    @patch('numpy.random.randint', return_value=42)
+    def test_images_renamed_in_channel_order(self, mock_1):
+        """
+        Test that the images are renamed in channel order and the legend image is removed.
+        :param mock_1: Mocks the random integer added to the image names.
+        """
+        rename_images(df=self.df_results, path_img=self.path_img, image_type='ss',
+                      raw_data_file_name='200708_7324_function')
+
+        self.assertEqual(self.expected_names, sorted(os.listdir(self.path_img)))
+
+    @patch('numpy.random.randint', return_value=42)
+    def test_ss_img_column_added(self, mock_1):
+        """
+        Test that the steady state image names are added to the returned DataFrame sorted on channel.
+        :param mock_1: Mocks the random integer added to the image names.
+        """
+        result = rename_images(df=self.df_results, path_img=self.path_img, image_type='ss',
+                               raw_data_file_name='200708_7324_function')
+
+        self.assertEqual([1, 2, 3], result['Channel'].tolist())
+        self.assertEqual(self.expected_names, result['Steady_State_Img'].tolist())
+
+    @patch('numpy.random.randint', return_value=42)
+    def test_senso_img_column_added(self, mock_1):
+        """
+        Test that the sensorgram image names are added to the returned DataFrame sorted on channel.
+        :param mock_1: Mocks the random integer added to the image names.
+        """
+        result = rename_images(df=self.df_results, path_img=self.path_img, image_type='senso',
+                               raw_data_file_name='200708_7324_function')
+
+        self.assertEqual(self.expected_names, result['Senso_Img'].tolist())
+        self.assertNotIn('Steady_State_Img', result.columns)
+
+    def test_working_directory_unchanged(self):
+        """
+        Test that renaming the images does not change the current working directory.
+        """
+        cwd = os.getcwd()
+
+        rename_images(df=self.df_results, path_img=self.path_img, image_type='ss',
+                      raw_data_file_name='200708_7324_function')
+
+        self.assertEqual(cwd, os.getcwd())
+
+    def test_image_count_mismatch_raises(self):
+        """
+        Test that a RuntimeError is raised and no image is renamed if the number of images and results differ.
+        """
+        with self.assertRaises(RuntimeError):
+            rename_images(df=self.df_results.iloc[:2], path_img=self.path_img, image_type='ss',
+                          raw_data_file_name='200708_7324_function')
+
+        self.assertEqual(['1-cycle_7.png', '2-cycle_7.png', '3-cycle_7.png'], sorted(os.listdir(self.path_img)))
+
+
+class TestCalcMaxTheoryDisp(TestCase):
+    """
+    Test class that tests the calc_max_theory_disp() method in isolation.
+    """
+
+    df_report_pt = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates a small report point table. Channel 1 has one pair of blanks, channel 3 has an odd number of blanks
+        and every other row should be excluded from the calculation.
+        :return: None
+        """
+        blank = ('Corrected', 'A-B-A binding late_1', 0)
+
+        rows = [
+            (3, *blank, 2.0),
+            (1, *blank, 10.0),
+            (3, *blank, 4.0),
+            (1, *blank, 20.0),
+            (3, *blank, 6.0),
+            # Rows that should not count: not corrected, wrong report point, non zero conc, channel not used.
+            (1, 'Reference', 'A-B-A binding late_1', 0, 1000.0),
+            (1, 'Corrected', 'A-B-A binding early_1', 0, 1000.0),
+            (1, 'Corrected', 'A-B-A binding late_1', 5, 1000.0),
+            (2, *blank, 1000.0),
+        ]
+
+        cls.df_report_pt = pd.DataFrame(rows, columns=['Channel', 'Sensorgram type', 'Name',
+                                                       'A-B-A 1 Concentration (µM)', 'Relative response (RU)'])
+
+    def test_order_follows_fc_used_arr(self):
+        """
+        Test that the values are returned in the order of fc_used_arr rather than the channel number.
+        """
+        result = calc_max_theory_disp(TestCalcMaxTheoryDisp.df_report_pt, [3, 1])
+
+        self.assertEqual([-3.0, -3.0, -15.0], result.tolist())
+
+        result = calc_max_theory_disp(TestCalcMaxTheoryDisp.df_report_pt, [1, 3])
+
+        self.assertEqual([-15.0, -3.0, -3.0], result.tolist())
+
+    def test_odd_trailing_blank_halved(self):
+        """
+        Test that an unpaired trailing blank is halved.
+        """
+        result = calc_max_theory_disp(TestCalcMaxTheoryDisp.df_report_pt, [3])
+
+        # (2 + 4) / 2 for the pair and 6 / 2 for the trailing blank.
+        self.assertEqual([-3.0, -3.0], result.tolist())
+
+    def test_only_corrected_late_binding_blanks_used(self):
+        """
+        Test that only corrected, A-B-A binding late_1, zero concentration rows of the used channels are counted.
+        """
+        result = calc_max_theory_disp(TestCalcMaxTheoryDisp.df_report_pt, [1])
+
+        self.assertEqual([-15.0], result.tolist())
+
+
+class TestReadReportPtFile(TestCase):
+    """
+    Test class that tests the read_report_pt_file() method in isolation.
+    """
+
+    @patch('pandas.read_excel')
+    def test_missing_columns_raise(self, mock_1):
+        """
+        Test that a ValueError naming the missing columns is raised if the report point table is missing columns.
+        :param mock_1: Mocks pandas.read_excel to return a report point table without the Name and Step purpose columns.
+        """
+        mock_1.return_value = pd.DataFrame(columns=['Cycle', 'Channel', 'Flow cell', 'Sensorgram type',
+                                                    'Relative response (RU)', 'A-B-A 1 Concentration (µM)',
+                                                    'A-B-A 1 Flanking solution'])
+
+        with self.assertRaisesRegex(ValueError, 'Missing columns: Name, Step purpose'):
+            read_report_pt_file(report_pt_file='report_pt.xlsx')
+
+
+class TestProteinInfoByChannel(TestCase):
+    """
+    Test class that tests reading the immobilized protein info from the config file and looking it up by channel.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a config with distinct protein info for each flow channel and kinetic results out of channel order.
+        :return: None
+        """
+        self.config = configparser.ConfigParser()
+        self.config['meta'] = {}
+        for fc in range(1, 9):
+            self.config['meta'][f'fc{fc}_protein_BIP'] = f'BIP-{fc}'
+            self.config['meta'][f'fc{fc}_protein_RU'] = str(fc * 100.0)
+            self.config['meta'][f'fc{fc}_protein_MW'] = str(fc * 1000.0)
+
+        self.df_senso_txt = pd.DataFrame({'Channel': [3, 1, 8, 1]}, index=[10, 11, 12, 13])
+
+    def test_protein_info_read_from_config(self):
+        """
+        Test that the protein info arrays are indexed by channel number - 1.
+        """
+        arr_protein_bip, arr_protein_ru, arr_protein_mw = read_immobilized_protein_info(config=self.config)
+
+        self.assertEqual(['BIP-' + str(fc) for fc in range(1, 9)], arr_protein_bip.tolist())
+        self.assertEqual([fc * 100.0 for fc in range(1, 9)], arr_protein_ru.tolist())
+        self.assertEqual([fc * 1000.0 for fc in range(1, 9)], arr_protein_mw.tolist())
+
+    def test_protein_info_matches_channels(self):
+        """
+        Test that the protein RU, MW and ID line up with the channel of each row and keep the index of the results.
+        """
+        arr_protein_bip, arr_protein_ru, arr_protein_mw = read_immobilized_protein_info(config=self.config)
+
+        result = get_protein_info_by_channel(df=self.df_senso_txt, arr_protein_ru=arr_protein_ru,
+                                             arr_protein_mw=arr_protein_mw, arr_protein_bip=arr_protein_bip)
+
+        self.assertEqual([10, 11, 12, 13], result.index.tolist())
+        self.assertEqual([300.0, 100.0, 800.0, 100.0], result['PROTEIN_RU'].tolist())
+        self.assertEqual([3000.0, 1000.0, 8000.0, 1000.0], result['PROTEIN_MW'].tolist())
+        self.assertEqual(['BIP-3', 'BIP-1', 'BIP-8', 'BIP-1'], result['PROTEIN_ID'].tolist())
+
+    def test_valid_channels_pass(self):
+        """
+        Test that whole number channels from 1 to 8 do not raise, including whole number floats.
+        """
+        validate_channels(series_channel=pd.Series([1, 4, 8]), num_channels=8)
+        validate_channels(series_channel=pd.Series([1.0, 8.0]), num_channels=8)
+
+    def test_invalid_channels_raise(self):
+        """
+        Test that channels that are out of range, not whole numbers or missing raise a RuntimeError.
+        """
+        for channel in [0, 9, 1.5, np.nan, 'A']:
+            with self.subTest(channel=channel):
+                with self.assertRaisesRegex(RuntimeError, 'invalid channels'):
+                    validate_channels(series_channel=pd.Series([1, channel]), num_channels=8)
+
+    def test_invalid_channel_raises_before_lookup(self):
+        """
+        Test that channel 0 raises rather than silently taking the protein info of flow channel 8.
+        """
+        arr_protein_bip, arr_protein_ru, arr_protein_mw = read_immobilized_protein_info(config=self.config)
+
+        with self.assertRaises(RuntimeError):
+            get_protein_info_by_channel(df=pd.DataFrame({'Channel': [0, 1]}), arr_protein_ru=arr_protein_ru,
+                                        arr_protein_mw=arr_protein_mw, arr_protein_bip=arr_protein_bip)
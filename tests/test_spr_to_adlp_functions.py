@@ -2,6 +2,8 @@
 Module for testing SPR to ADLP functions that may be used across similar scripts.
 """
 
+import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 from sqlalchemy import create_engine, Table, MetaData, select
@@ -11,7 +13,7 @@ from cryptography.fernet import Fernet
 
 # Import functions for testing
 from SPR_to_ADLP_Functions.common_functions import rep_item_for_dot_df, get_structures_smiles_from_db, \
-    spr_binding_top_for_dot_file
+    spr_binding_top_for_dot_file, render_structure_imgs
 
 
 class TestReplicateItemFunct(TestCase):
@@ -259,6 +261,63 @@ class TestGetStructSmilesDB(TestCase):
             self.assertEqual(expected_smiles, result_smiles)
 
 
+class TestRenderStructureImgs(TestCase):
+    """
+    Test class that tests the render_structure_imgs() method using a temporary image directory, both when rendering
+    serially and when rendering with a process pool.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a temporary image directory and a DataFrame of smiles where the second smile was not found.
+        :return: None
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.img_dir = self.tmp_dir.name
+
+        self.df_with_smiles = pd.DataFrame(
+            {'Broad ID': ['BRD-K81106261-001-01-4', 'BRD-K00024350-001-01-9', 'BRD-K00024351-001-01-9',
+                          'BRD-K00024352-001-01-9'],
+             'BROAD_CORE_ID': ['81106261', '00024350', '00024351', '00024352'],
+             'SMILES': ['CCO', np.nan, 'c1ccccc1', 'CC(=O)O']})
+
+        self.expected_names = ['0_BRD-K81106261-001-01-4.png', '2_BRD-K00024351-001-01-9.png',
+                               '3_BRD-K00024352-001-01-9.png']
+
+        self.expected_paths = [os.path.join(self.img_dir, '0_BRD-K81106261-001-01-4.png'), 'Not Found',
+                               os.path.join(self.img_dir, '2_BRD-K00024351-001-01-9.png'),
+                               os.path.join(self.img_dir, '3_BRD-K00024352-001-01-9.png')]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _assert_rendered(self, result):
+        """
+        Asserts that the image paths keep the row order and that only the found smiles were rendered.
+        :param result: DataFrame returned by render_structure_imgs()
+        """
+        self.assertEqual(self.expected_paths, result['IMG_PATH'].tolist())
+        self.assertEqual(self.df_with_smiles['Broad ID'].tolist(), result['Broad ID'].tolist())
+        self.assertEqual(self.expected_names, sorted(os.listdir(self.img_dir)))
+
+    def test_render_serial(self):
+        """
+        Test rendering the structures one after another, which is used for small structure sets.
+        """
+        result = render_structure_imgs(df_with_smiles=self.df_with_smiles, dir=self.img_dir)
+
+        self._assert_rendered(result)
+
+    @patch('SPR_to_ADLP_Functions.common_functions._MIN_STRUCTURES_FOR_POOL', 1)
+    def test_render_process_pool(self):
+        """
+        Test rendering the structures with a process pool, which is used for large structure sets.
+        """
+        result = render_structure_imgs(df_with_smiles=self.df_with_smiles, dir=self.img_dir)
+
+        self._assert_rendered(result)
+
+
 class TestInsertSSandSensoImages(TestCase):
 
     def test_(self):